@@ -1,21 +1,31 @@
-from fastapi import APIRouter, HTTPException
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
 from chatbot.models.chat_models import ChatRequest, ChatResponse
-from chatbot.services.groq_service import GroqChatService
+from chatbot.services.groq_service import GroqChatService, ServiceOverloadedError
 from typing import List
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/chatbot", tags=["chatbot"])
 
-# Initialize the Groq service
-groq_service = GroqChatService()
+def get_groq_service(request: Request) -> GroqChatService:
+    # The service is created by the app lifespan and is None if startup failed
+    groq_service = getattr(request.app.state, "groq", None)
+    if groq_service is None:
+        raise HTTPException(status_code=503, detail="Chatbot service unavailable")
+    return groq_service
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, groq_service: GroqChatService = Depends(get_groq_service)):
     """
     Send a message to the chatbot and get a response
     """
     try:
-        response = groq_service.chat(
+        response = await groq_service.chat(
             message=request.message,
             conversation_id=request.conversation_id
         )
@@ -26,42 +36,80 @@ async def chat_endpoint(request: ChatRequest):
             timestamp=response["timestamp"]
         )
     
-    except Exception as e:
-        print(f"Chat endpoint error: {e}")
+    except ServiceOverloadedError:
+        # Ask clients to back off briefly rather than piling more load onto Groq
+        raise HTTPException(status_code=503, detail="Chatbot is busy, please retry", headers={"Retry-After": "1"})
+
+    except Exception:
+        logger.exception("Chat endpoint failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, groq_service: GroqChatService = Depends(get_groq_service)):
+    """
+    Send a message to the chatbot and stream the response as server-sent events
+    """
+    conversation_id = request.conversation_id or groq_service.generate_conversation_id()
+
+    # Reserve the Groq call slot before any headers go out so overload is a real 503
+    try:
+        slot = await groq_service.acquire_slot()
+    except ServiceOverloadedError:
+        raise HTTPException(status_code=503, detail="Chatbot is busy, please retry", headers={"Retry-After": "1"})
+
+    async def event_stream():
+        # Chunks are JSON-encoded so newlines in the reply don't break SSE framing
+        try:
+            yield f"event: start\ndata: {json.dumps({'conversation_id': conversation_id})}\n\n"
+            async for content in groq_service.chat_stream(request.message, conversation_id, slot):
+                yield f"data: {json.dumps(content)}\n\n"
+        except Exception:
+            # The reply was cut off mid-stream and the turn was not saved
+            logger.exception("Chat stream failed")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Internal server error'})}\n\n"
+            return
+        finally:
+            slot.release()
+        yield "event: done\ndata: {}\n\n"
+
+    # The background task frees the slot even if the client leaves before streaming starts
+    return StreamingResponse(event_stream(), media_type="text/event-stream", background=BackgroundTask(slot.release))
+
 @router.get("/conversation/{conversation_id}")
-async def get_conversation_history(conversation_id: str):
+async def get_conversation_history(conversation_id: str, groq_service: GroqChatService = Depends(get_groq_service)):
     """
     Get the conversation history for a specific conversation
     """
     try:
-        history = groq_service.get_conversation_history(conversation_id)
+        history = await groq_service.get_conversation_history(conversation_id)
         return {"conversation_id": conversation_id, "messages": history}
     
-    except Exception as e:
-        print(f"Get conversation error: {e}")
+    except Exception:
+        logger.exception("Get conversation failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/conversation/{conversation_id}")
-async def clear_conversation(conversation_id: str):
+async def clear_conversation(conversation_id: str, groq_service: GroqChatService = Depends(get_groq_service)):
     """
     Clear a conversation history
     """
     try:
-        success = groq_service.clear_conversation(conversation_id)
-        if success:
-            return {"message": "Conversation cleared successfully"}
-        else:
-            raise HTTPException(status_code=404, detail="Conversation not found")
+        success = await groq_service.clear_conversation(conversation_id)
     
-    except Exception as e:
-        print(f"Clear conversation error: {e}")
+    except Exception:
+        logger.exception("Clear conversation failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    if not success:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {"message": "Conversation cleared successfully"}
+
 @router.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """
     Health check endpoint for the chatbot service
     """
+    # Report degraded while the service failed to start so load balancers route around it
+    if getattr(request.app.state, "groq", None) is None:
+        return JSONResponse(status_code=503, content={"status": "degraded", "service": "chatbot"})
     return {"status": "healthy", "service": "chatbot"}
\ No newline at end of file
@@ -1,23 +1,75 @@
 import os
+import atexit
+import logging
+import logging.handlers
+import queue
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from chatbot.api.chatbot_routes import router as chatbot_router
+from chatbot.services.groq_service import GroqChatService
+
+def configure_logging() -> None:
+    # Handlers write from a background thread so request coroutines never block on stdout
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)], force=True)
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A failed start is logged and the app keeps serving health checks;
+    # chatbot routes answer 503 until the service is available
+    app.state.groq = None
+    groq_service = None
+    try:
+        groq_service = GroqChatService()
+        await groq_service.astart()
+        app.state.groq = groq_service
+    except Exception:
+        logger.exception("Failed to start chatbot service")
+        # Release whatever astart() created before it failed
+        if groq_service is not None:
+            await groq_service.aclose()
+
+    yield
+
+    if app.state.groq is not None:
+        await app.state.groq.aclose()
 
 # Create FastAPI app
 app = FastAPI(
     title="Campus Event Chatbot API",
     description="AI-powered chatbot for campus event management assistance",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5000", "https://*.replit.dev", "*"],  # Update with your frontend URL
+    # Comma-separated list of frontend origins allowed to call the API
+    allow_origins=[
+        origin.strip()
+        for origin in os.getenv("FRONTEND_ORIGIN", "http://localhost:5000").split(",")
+        if origin.strip()
+    ],
+    # Optional pattern for per-deployment preview domains, e.g. https://[a-z0-9-]+\.replit\.dev
+    allow_origin_regex=os.getenv("FRONTEND_ORIGIN_REGEX"),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers cache preflight responses for 24 hours
+    max_age=86400,
 )
 
 # Include chatbot routes
@@ -33,10 +85,38 @@ async def health():
 
 if __name__ == "__main__":
     port = int(os.getenv("CHATBOT_PORT", "8001"))
+    # Reload is for local development only; it forces a single worker process
+    reload = os.getenv("CHATBOT_RELOAD", "").lower() in ("1", "true", "yes")
+    # Conversation history is only shared between processes through Redis, so
+    # scale out by default only when REDIS_URL is configured
+    redis_url = os.getenv("REDIS_URL")
+    groq_rpm = float(os.getenv("GROQ_RPM", "30"))
+    if groq_rpm <= 0:
+        raise SystemExit(f"GROQ_RPM must be positive, got {groq_rpm:g}")
+    # Each worker gets an even share of GROQ_RPM, so never default to more workers than RPM
+    default_workers = min((os.cpu_count() or 1) * 2 + 1, max(int(groq_rpm), 1)) if redis_url else 1
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", str(default_workers)))
+    if workers > 1 and not redis_url:
+        logger.warning(
+            "Running %d workers without REDIS_URL: conversation history is per process "
+            "and follow-up turns may lose their context", workers
+        )
+    if workers > groq_rpm:
+        logger.warning(
+            "Running %d workers with GROQ_RPM=%g: each worker may call Groq less than once a minute",
+            workers, groq_rpm
+        )
+    # Workers read this to split the Groq rate and concurrency budgets between them
+    os.environ["WEB_CONCURRENCY"] = str(workers)
     uvicorn.run(
         "chatbot.main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
-        log_level="info"
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        reload=reload,
+        log_level="info",
+        # Let uvicorn's loggers propagate to the queue-backed root handler
+        log_config=None
     )
\ No newline at end of file
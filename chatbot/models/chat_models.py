@@ -3,7 +3,6 @@ from typing import List, Optional
 from datetime import datetime
 
 class ChatMessage(BaseModel):
-    id: str
     role: str  # "user" or "assistant"
     content: str
     timestamp: datetime
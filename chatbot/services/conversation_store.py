@@ -0,0 +1,142 @@
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import List
+
+# Messages retained per conversation
+HISTORY_MAX_MESSAGES = 20
+# Idle conversations are dropped after this many seconds, oldest first past the cap
+CONVERSATION_TTL_SECONDS = int(os.getenv("CHATBOT_CONVERSATION_TTL", "1800"))
+MAX_CONVERSATIONS = int(os.getenv("CHATBOT_MAX_CONVERSATIONS", "10000"))
+
+
+@dataclass(slots=True)
+class Turn:
+    """A single stored message; `ts` is a Unix timestamp in seconds."""
+
+    role: str
+    content: str
+    ts: float
+
+
+class InMemoryConversationStore:
+    """Process-local conversation store with per-conversation and idle-TTL bounds."""
+
+    def __init__(self):
+        # Ordered by last activity so idle conversations can be evicted from the front
+        self.conversations: OrderedDict[str, deque[Turn]] = OrderedDict()
+        self.last_active: dict[str, float] = {}
+
+    def _evict_idle(self, now: float) -> None:
+        while self.conversations:
+            oldest = next(iter(self.conversations))
+            expired = now - self.last_active[oldest] > CONVERSATION_TTL_SECONDS
+            if not expired and len(self.conversations) <= MAX_CONVERSATIONS:
+                break
+            self.conversations.popitem(last=False)
+            del self.last_active[oldest]
+
+    def _touch(self, conversation_id: str) -> deque[Turn]:
+        now = time.monotonic()
+        history = self._get_live(conversation_id)
+        if history is None:
+            history = deque(maxlen=HISTORY_MAX_MESSAGES)
+            self.conversations[conversation_id] = history
+        else:
+            self.conversations.move_to_end(conversation_id)
+        self.last_active[conversation_id] = now
+
+        # Evict after inserting so the store never holds more than MAX_CONVERSATIONS
+        self._evict_idle(now)
+        return history
+
+    def _get_live(self, conversation_id: str) -> deque[Turn] | None:
+        # Read-only lookup that treats a conversation past its TTL as gone
+        history = self.conversations.get(conversation_id)
+        if history is None:
+            return None
+        if time.monotonic() - self.last_active[conversation_id] > CONVERSATION_TTL_SECONDS:
+            del self.conversations[conversation_id]
+            del self.last_active[conversation_id]
+            return None
+        return history
+
+    async def get_recent(self, conversation_id: str, limit: int) -> List[Turn]:
+        history = self._get_live(conversation_id)
+        if history is None:
+            return []
+        return list(islice(history, max(len(history) - limit, 0), None))
+
+    async def append(self, conversation_id: str, *turns: Turn) -> None:
+        self._touch(conversation_id).extend(turns)
+
+    async def get_history(self, conversation_id: str) -> List[Turn]:
+        return list(self._get_live(conversation_id) or ())
+
+    async def clear(self, conversation_id: str) -> bool:
+        if self._get_live(conversation_id) is None:
+            return False
+        del self.conversations[conversation_id]
+        del self.last_active[conversation_id]
+        return True
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RedisConversationStore:
+    """Redis-backed conversation store shared by every worker process.
+
+    Each conversation is a list at `conv:{id}` holding msgpack-encoded
+    (role, content, ts) turns, trimmed to the newest HISTORY_MAX_MESSAGES and expiring after
+    CONVERSATION_TTL_SECONDS of inactivity. Requires the optional `redis` and
+    `msgpack` packages.
+    """
+
+    def __init__(self, url: str):
+        import msgpack
+        import redis.asyncio as redis
+
+        self.msgpack = msgpack
+        self.redis = redis.from_url(url)
+
+    @staticmethod
+    def _key(conversation_id: str) -> str:
+        return f"conv:{conversation_id}"
+
+    def _pack(self, turn: Turn) -> bytes:
+        return self.msgpack.packb((turn.role, turn.content, turn.ts))
+
+    def _unpack(self, raw: bytes) -> Turn:
+        return Turn(*self.msgpack.unpackb(raw))
+
+    async def get_recent(self, conversation_id: str, limit: int) -> List[Turn]:
+        raw = await self.redis.lrange(self._key(conversation_id), -limit, -1)
+        return [self._unpack(item) for item in raw]
+
+    async def append(self, conversation_id: str, *turns: Turn) -> None:
+        key = self._key(conversation_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *(self._pack(turn) for turn in turns))
+            pipe.ltrim(key, -HISTORY_MAX_MESSAGES, -1)
+            pipe.expire(key, CONVERSATION_TTL_SECONDS)
+            await pipe.execute()
+
+    async def get_history(self, conversation_id: str) -> List[Turn]:
+        raw = await self.redis.lrange(self._key(conversation_id), 0, -1)
+        return [self._unpack(item) for item in raw]
+
+    async def clear(self, conversation_id: str) -> bool:
+        return await self.redis.delete(self._key(conversation_id)) > 0
+
+    async def aclose(self) -> None:
+        await self.redis.aclose()
+
+
+def create_conversation_store():
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return RedisConversationStore(redis_url)
+    return InMemoryConversationStore()
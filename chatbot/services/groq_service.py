@@ -1,22 +1,40 @@
 import os
-from groq import Groq
-from typing import List
+import json
+import asyncio
+import logging
+import hashlib
+import time
+import httpx
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from groq import AsyncGroq
+from typing import AsyncIterator, List
 import uuid
 from datetime import datetime
+from chatbot.services.conversation_store import Turn, create_conversation_store
+from chatbot.services.rate_limiter import AsyncTokenBucket
+from chatbot.services.semantic_cache import SemanticCache
 
-class GroqChatService:
-    def __init__(self):
-        self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY environment variable is required")
-        
-        self.client = Groq(api_key=self.api_key)
-        
-        # Store conversation history in memory (in production, use a database)
-        self.conversations = {}
-    
-    def get_system_prompt(self) -> str:
-        return """You are a helpful AI assistant for a Campus Event Management Platform. You can help users with:
+logger = logging.getLogger(__name__)
+
+# Fixed sampling seed so identical prompts produce reproducible, cacheable replies
+COMPLETION_SEED = 42
+RESPONSE_CACHE_SIZE = 2048
+FALLBACK_MESSAGE = "I'm sorry, I'm having trouble connecting right now. Please try again in a moment."
+# Number of most recent messages sent to the model as context
+CONTEXT_MESSAGES = 10
+# GROQ_RPM and GROQ_MAX_INFLIGHT are totals for the deployment; each worker
+# process enforces its even share of them
+WORKERS = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+# Groq requests-per-minute budget enforced before each API call
+GROQ_RPM = float(os.getenv("GROQ_RPM", "30")) / WORKERS
+# Concurrent Groq calls allowed, and how long a request may wait for a free slot
+GROQ_MAX_INFLIGHT = max(int(os.getenv("GROQ_MAX_INFLIGHT", "16")) // WORKERS, 1)
+INFLIGHT_ACQUIRE_TIMEOUT = 0.5
+
+# Any edit to the prompt text invalidates provider-side prefix caches and the
+# response cache, so bump the version suffix to mark the expected cold period
+_SYSTEM_PROMPT_V1 = """You are a helpful AI assistant for a Campus Event Management Platform. You can help users with:
 
 1. **Event Information**: Answer questions about campus events, registration processes, and event details
 2. **Platform Features**: Explain how to use the platform's features like event creation, registration, attendance tracking
@@ -31,58 +49,194 @@ Key features of the platform:
 
 Be friendly, helpful, and concise in your responses. If users ask about specific events or account details, remind them that you can provide general guidance but they should check the platform directly for their personal information."""
 
-    def generate_conversation_id(self) -> str:
-        return str(uuid.uuid4())
+class ServiceOverloadedError(Exception):
+    """Raised when no Groq call slot frees up in time; callers should retry later."""
 
-    def chat(self, message: str, conversation_id: str | None = None) -> dict:
-        if not conversation_id:
-            conversation_id = self.generate_conversation_id()
-            self.conversations[conversation_id] = []
 
-        # Get conversation history
-        history = self.conversations.get(conversation_id, [])
-        
-        # Prepare messages for the API
-        messages = [{"role": "system", "content": self.get_system_prompt()}]
-        
-        # Add conversation history
-        for msg in history[-10:]:  # Keep last 10 messages for context
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+class InflightSlot:
+    """A held Groq call slot; `release()` is safe to call more than once."""
+
+    __slots__ = ("_semaphore",)
+
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self._semaphore = semaphore
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+            self._semaphore = None
+
+
+class GroqChatService:
+    # Built once at import so every request shares a byte-identical system message
+    SYSTEM_MESSAGE = ({"role": "system", "content": _SYSTEM_PROMPT_V1},)
+
+    def __init__(self):
+        self.api_key = os.getenv("GROQ_API_KEY")
+        if not self.api_key:
+            raise ValueError("GROQ_API_KEY environment variable is required")
         
-        # Add current user message
-        messages.append({"role": "user", "content": message})
+        # Network clients and stores are created in astart() inside the running event loop
+        self.http_client: httpx.AsyncClient | None = None
+        self.client: AsyncGroq | None = None
+        self.conversations = None
+        self.semantic_cache: SemanticCache | None = None
+
+        if GROQ_RPM <= 0:
+            raise ValueError(f"GROQ_RPM must be positive, got {GROQ_RPM * WORKERS:g}")
+        self.limiter = AsyncTokenBucket(GROQ_RPM)
+        self.inflight = asyncio.Semaphore(GROQ_MAX_INFLIGHT)
+
+
+        # LRU cache of assistant replies keyed by a hash of the full prompt
+        self.response_cache: OrderedDict[str, str] = OrderedDict()
+    
+    async def astart(self) -> None:
+        # One pooled keep-alive HTTP/2 client is shared for the service lifetime
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=30
+        )
+        self.client = AsyncGroq(api_key=self.api_key, http_client=self.http_client)
+
+        # Conversation history lives in Redis when REDIS_URL is set, otherwise in memory
+        self.conversations = create_conversation_store()
+
+        # Optional embedding-based cache for paraphrased first-turn questions
+        if os.getenv("CHATBOT_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes"):
+            index_path = os.getenv("CHATBOT_SEMANTIC_CACHE_PATH")
+            if WORKERS > 1:
+                # Workers would overwrite each other's saved index, so keep it in memory only
+                logger.warning(
+                    "Semantic cache is per process with %d workers; persistence is disabled", WORKERS
+                )
+                index_path = None
+            self.semantic_cache = await asyncio.to_thread(
+                SemanticCache,
+                threshold=float(os.getenv("CHATBOT_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+                index_path=index_path
+            )
+
+    async def aclose(self) -> None:
+        # Closing the Groq client also closes the HTTP client it was given
+        if self.client is not None:
+            await self.client.close()
+        elif self.http_client is not None:
+            await self.http_client.aclose()
+        if self.conversations is not None:
+            await self.conversations.aclose()
+        if self.semantic_cache is not None:
+            await asyncio.to_thread(self.semantic_cache.save)
+
+    def generate_conversation_id(self) -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def _cache_key(messages: List[dict]) -> str:
+        payload = json.dumps(messages, sort_keys=True).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _get_cached_response(self, key: str) -> str | None:
+        response = self.response_cache.get(key)
+        if response is not None:
+            self.response_cache.move_to_end(key)
+        return response
+
+    def _cache_response(self, key: str, response: str) -> None:
+        self.response_cache[key] = response
+        self.response_cache.move_to_end(key)
+        if len(self.response_cache) > RESPONSE_CACHE_SIZE:
+            self.response_cache.popitem(last=False)
+
+    def _build_messages(self, history: List[Turn], message: str) -> List[dict]:
+        # System prompt, then the history projected to the API wire format, then the new message.
+        # History is append-only, so consecutive turns share the same prompt prefix.
+        return [
+            *self.SYSTEM_MESSAGE,
+            *({"role": turn.role, "content": turn.content} for turn in history),
+            {"role": "user", "content": message}
+        ]
+
+    async def _lookup_cached(self, cache_key: str, message: str, first_turn: bool) -> str | None:
+        response = self._get_cached_response(cache_key)
+
+        # Paraphrase lookup only applies to questions without prior context
+        if response is None and first_turn and self.semantic_cache is not None:
+            response = await asyncio.to_thread(self.semantic_cache.lookup, message)
+            if response is not None:
+                self._cache_response(cache_key, response)
+        return response
+
+    async def _store_cached(self, cache_key: str, message: str, response: str, first_turn: bool) -> None:
+        self._cache_response(cache_key, response)
+        if first_turn and self.semantic_cache is not None:
+            await asyncio.to_thread(self.semantic_cache.add, message, response)
+
+    async def _save_turn(self, conversation_id: str, message: str, response_content: str) -> datetime:
+        ts = time.time()
         
+        # Add user message and assistant response to history
+        await self.conversations.append(
+            conversation_id,
+            Turn("user", message, ts),
+            Turn("assistant", response_content, ts)
+        )
+        return datetime.fromtimestamp(ts)
+
+    async def acquire_slot(self) -> InflightSlot:
+        """Reserve a Groq call slot, raising ServiceOverloadedError if none frees up in time."""
+        # Shed load quickly instead of queueing an unbounded backlog behind Groq
+        try:
+            await asyncio.wait_for(self.inflight.acquire(), timeout=INFLIGHT_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ServiceOverloadedError("Too many Groq requests in flight") from None
+        return InflightSlot(self.inflight)
+
+    @asynccontextmanager
+    async def _inflight_slot(self):
+        slot = await self.acquire_slot()
         try:
-            # Get response from Groq
-            response = self.client.chat.completions.create(
+            yield
+        finally:
+            slot.release()
+
+    async def _complete(self, messages: List[dict], conversation_id: str) -> str:
+        async with self._inflight_slot():
+            # Wait for rate limit capacity before calling Groq
+            await self.limiter.acquire()
+            response = await self.client.chat.completions.create(
                 model="llama-3.1-70b-versatile",
                 messages=messages,
                 temperature=0.7,
-                max_tokens=1024
+                max_tokens=1024,
+                seed=COMPLETION_SEED,
+                # Stable per-conversation user id lets the provider route to cache-warm workers
+                user=conversation_id
             )
-            response_content = response.choices[0].message.content
+            return response.choices[0].message.content
+
+    async def chat(self, message: str, conversation_id: str | None = None) -> dict:
+        if not conversation_id:
+            conversation_id = self.generate_conversation_id()
+
+        # Get conversation history
+        history = await self.conversations.get_recent(conversation_id, CONTEXT_MESSAGES)
+        messages = self._build_messages(history, message)
+        
+        try:
+            # Serve repeated prompts from the cache before calling Groq
+            cache_key = self._cache_key(messages)
+            first_turn = not history
+            response_content = await self._lookup_cached(cache_key, message, first_turn)
+
+            if response_content is None:
+                # Get response from Groq
+                response_content = await self._complete(messages, conversation_id)
+                await self._store_cached(cache_key, message, response_content, first_turn)
             
             # Update conversation history
-            timestamp = datetime.now()
-            
-            # Add user message to history
-            self.conversations[conversation_id].append({
-                "id": str(uuid.uuid4()),
-                "role": "user",
-                "content": message,
-                "timestamp": timestamp
-            })
-            
-            # Add assistant response to history
-            self.conversations[conversation_id].append({
-                "id": str(uuid.uuid4()),
-                "role": "assistant", 
-                "content": response_content,
-                "timestamp": timestamp
-            })
+            timestamp = await self._save_turn(conversation_id, message, response_content)
             
             return {
                 "message": response_content,
@@ -90,19 +244,87 @@ Be friendly, helpful, and concise in your responses. If users ask about specific
                 "timestamp": timestamp
             }
             
-        except Exception as e:
-            print(f"Error in Groq API call: {e}")
+        except ServiceOverloadedError:
+            raise
+
+        except Exception:
+            logger.exception("Groq API call failed")
             return {
-                "message": "I'm sorry, I'm having trouble connecting right now. Please try again in a moment.",
+                "message": FALLBACK_MESSAGE,
                 "conversation_id": conversation_id,
                 "timestamp": datetime.now()
             }
 
-    def get_conversation_history(self, conversation_id: str) -> List[dict]:
-        return self.conversations.get(conversation_id, [])
+    async def chat_stream(
+        self, message: str, conversation_id: str, slot: InflightSlot | None = None
+    ) -> AsyncIterator[str]:
+        """Yield the assistant reply in chunks as Groq generates it.
+
+        `slot` is a call slot the caller already holds from `acquire_slot()`;
+        it is released once Groq finishes. A failure before any chunk is sent
+        yields the fallback message; a failure mid-reply is re-raised so the
+        caller can report the cut-off.
+        """
+        chunks: List[str] = []
+        try:
+            history = await self.conversations.get_recent(conversation_id, CONTEXT_MESSAGES)
+            messages = self._build_messages(history, message)
+
+            cache_key = self._cache_key(messages)
+            first_turn = not history
+
+            # Cached replies are sent as a single chunk
+            response_content = await self._lookup_cached(cache_key, message, first_turn)
+            if response_content is not None:
+                if slot is not None:
+                    slot.release()
+                chunks.append(response_content)
+                yield response_content
+            else:
+                if slot is None:
+                    slot = await self.acquire_slot()
+                await self.limiter.acquire()
+                stream = await self.client.chat.completions.create(
+                    model="llama-3.1-70b-versatile",
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1024,
+                    seed=COMPLETION_SEED,
+                    user=conversation_id,
+                    stream=True
+                )
+                async for chunk in stream:
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        chunks.append(content)
+                        yield content
+                slot.release()
+
+                # Record the full reply only once the stream has completed
+                response_content = "".join(chunks)
+                await self._store_cached(cache_key, message, response_content, first_turn)
+
+            await self._save_turn(conversation_id, message, response_content)
+
+        except ServiceOverloadedError:
+            raise
+
+        except Exception:
+            logger.exception("Groq streaming call failed")
+            if chunks:
+                raise
+            yield FALLBACK_MESSAGE
+
+        finally:
+            if slot is not None:
+                slot.release()
+
+    async def get_conversation_history(self, conversation_id: str) -> List[dict]:
+        history = await self.conversations.get_history(conversation_id)
+        return [
+            {"role": turn.role, "content": turn.content, "timestamp": datetime.fromtimestamp(turn.ts)}
+            for turn in history
+        ]
 
-    def clear_conversation(self, conversation_id: str) -> bool:
-        if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
-            return True
-        return False
\ No newline at end of file
+    async def clear_conversation(self, conversation_id: str) -> bool:
+        return await self.conversations.clear(conversation_id)
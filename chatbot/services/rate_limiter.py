@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """Token bucket that paces callers to at most `rpm` requests per minute.
+
+    `rpm` may be fractional, e.g. one worker's share of a deployment-wide
+    budget; the bucket always holds at least one token so a request can go out.
+    """
+
+    def __init__(self, rpm: float):
+        if rpm <= 0:
+            raise ValueError(f"Requests per minute must be positive, got {rpm}")
+        self.capacity = max(float(rpm), 1.0)
+        self.rate = rpm / 60
+        self.tokens = self.capacity
+        self._ts = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
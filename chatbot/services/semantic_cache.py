@@ -0,0 +1,100 @@
+import os
+import json
+import logging
+import threading
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of prompt -> response pairs.
+
+    Messages are embedded with a sentence-transformers model and stored in a
+    FAISS inner-product index over L2-normalized vectors, so search scores are
+    cosine similarities. Requires the optional `sentence-transformers` and
+    `faiss-cpu` packages.
+
+    The cache is process-local and each instance loads its own model, so it is
+    meant for single-worker deployments. Concurrent processes sharing one
+    `index_path` would overwrite each other's entries.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        threshold: float = 0.92,
+        index_path: str | None = None,
+        save_every: int = 50,
+    ):
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self.faiss = faiss
+        self.model = SentenceTransformer(model_name)
+        self.threshold = threshold
+        self.index_path = index_path
+        self.save_every = save_every
+
+        self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+        self.responses: List[str] = []
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        if index_path and os.path.exists(index_path):
+            self._load()
+
+    def _embed(self, text: str):
+        return self.model.encode([text], normalize_embeddings=True).astype("float32")
+
+    def lookup(self, message: str) -> str | None:
+        vector = self._embed(message)
+        with self._lock:
+            if self.index.ntotal == 0:
+                return None
+            scores, ids = self.index.search(vector, 1)
+            if scores[0][0] >= self.threshold:
+                return self.responses[ids[0][0]]
+        return None
+
+    def add(self, message: str, response: str) -> None:
+        vector = self._embed(message)
+        with self._lock:
+            self.index.add(vector)
+            self.responses.append(response)
+            self._unsaved += 1
+            if self.index_path and self._unsaved >= self.save_every:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            if self.index_path and self._unsaved:
+                self._save()
+
+    def _save(self) -> None:
+        # Both files are written to temporaries and swapped in with os.replace.
+        # Responses go first: entries are append-only, so a crash between the
+        # two swaps leaves extra responses that _load() trims to the index.
+        responses_path = f"{self.index_path}.responses.json"
+        with open(f"{responses_path}.tmp", "w") as f:
+            json.dump(self.responses, f)
+        self.faiss.write_index(self.index, f"{self.index_path}.tmp")
+        os.replace(f"{responses_path}.tmp", responses_path)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+        self._unsaved = 0
+
+    def _load(self) -> None:
+        # Any unusable saved state starts an empty cache rather than failing startup
+        try:
+            index = self.faiss.read_index(self.index_path)
+            with open(f"{self.index_path}.responses.json") as f:
+                responses = json.load(f)
+        except Exception:
+            logger.warning("Could not load semantic cache from %s; starting empty", self.index_path, exc_info=True)
+            return
+        if index.d != self.index.d or len(responses) < index.ntotal:
+            # Built with another embedding model, or the files don't belong together
+            logger.warning("Saved semantic cache at %s does not match; starting empty", self.index_path)
+            return
+        self.index = index
+        self.responses = responses[:index.ntotal]
@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from chatbot.api.chatbot_routes import get_groq_service, router
+from chatbot.services.groq_service import ServiceOverloadedError
+
+
+class FakeSlot:
+    def __init__(self):
+        self.released = 0
+
+    def release(self) -> None:
+        self.released += 1
+
+
+class FakeService:
+    def __init__(self, chunks=("Hello", " world\n"), overloaded=False, fail_after=None):
+        self.chunks = chunks
+        self.overloaded = overloaded
+        self.fail_after = fail_after
+        self.slots = []
+
+    def generate_conversation_id(self) -> str:
+        return "c1"
+
+    async def chat(self, message, conversation_id=None):
+        if self.overloaded:
+            raise ServiceOverloadedError()
+        return {"message": "hi", "conversation_id": conversation_id or "c1", "timestamp": datetime.now()}
+
+    async def acquire_slot(self):
+        if self.overloaded:
+            raise ServiceOverloadedError()
+        slot = FakeSlot()
+        self.slots.append(slot)
+        return slot
+
+    async def chat_stream(self, message, conversation_id, slot=None):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("Groq went away")
+            yield chunk
+
+    async def clear_conversation(self, conversation_id) -> bool:
+        return False
+
+
+def make_client(service, with_state=True) -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    if with_state:
+        app.state.groq = service
+    app.dependency_overrides[get_groq_service] = lambda: service
+    return TestClient(app)
+
+
+def parse_events(body: str) -> list[tuple[str, str]]:
+    events = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields.get("event", "message"), fields["data"]))
+    return events
+
+
+def test_stream_frames_chunks_as_server_sent_events():
+    service = FakeService()
+    response = make_client(service).post("/api/chatbot/chat/stream", json={"message": "hi"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert events[0] == ("start", json.dumps({"conversation_id": "c1"}))
+    # Newlines inside a chunk stay JSON-escaped so they can't end the event early
+    assert [json.loads(data) for _, data in events[1:-1]] == ["Hello", " world\n"]
+    assert events[-1] == ("done", "{}")
+    assert service.slots[0].released >= 1
+
+
+def test_stream_failure_mid_reply_ends_with_error_event():
+    service = FakeService(fail_after=1)
+    response = make_client(service).post("/api/chatbot/chat/stream", json={"message": "hi"})
+
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == ["start", "message", "error"]
+    assert service.slots[0].released >= 1
+
+
+@pytest.mark.parametrize("path", ["/api/chatbot/chat", "/api/chatbot/chat/stream"])
+def test_overload_maps_to_503_with_retry_after(path):
+    response = make_client(FakeService(overloaded=True)).post(path, json={"message": "hi"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_clearing_unknown_conversation_returns_404():
+    response = make_client(FakeService()).delete("/api/chatbot/conversation/missing")
+
+    assert response.status_code == 404
+
+
+def test_health_reports_degraded_without_service():
+    client = make_client(FakeService(), with_state=False)
+
+    response = client.get("/api/chatbot/health")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "degraded"
+
+
+def test_health_reports_healthy_with_service():
+    response = make_client(FakeService()).get("/api/chatbot/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from chatbot.services import conversation_store
+from chatbot.services.conversation_store import InMemoryConversationStore, Turn
+
+
+@pytest.fixture(autouse=True)
+def short_ttl(monkeypatch):
+    monkeypatch.setattr(conversation_store, "CONVERSATION_TTL_SECONDS", 60)
+
+
+def turn(content: str) -> Turn:
+    return Turn("user", content, 0.0)
+
+
+def test_get_recent_returns_last_messages():
+    store = InMemoryConversationStore()
+    asyncio.run(store.append("c1", *(turn(str(i)) for i in range(5))))
+
+    recent = asyncio.run(store.get_recent("c1", 2))
+
+    assert [t.content for t in recent] == ["3", "4"]
+
+
+def test_history_is_bounded_per_conversation():
+    store = InMemoryConversationStore()
+    total = conversation_store.HISTORY_MAX_MESSAGES + 5
+    asyncio.run(store.append("c1", *(turn(str(i)) for i in range(total))))
+
+    history = asyncio.run(store.get_history("c1"))
+
+    assert len(history) == conversation_store.HISTORY_MAX_MESSAGES
+    assert history[-1].content == str(total - 1)
+
+
+def test_reads_do_not_create_conversations():
+    store = InMemoryConversationStore()
+
+    assert asyncio.run(store.get_recent("missing", 10)) == []
+    assert asyncio.run(store.get_history("missing")) == []
+    assert asyncio.run(store.clear("missing")) is False
+
+
+def test_clear_removes_existing_conversation():
+    store = InMemoryConversationStore()
+    asyncio.run(store.append("c1", turn("hi")))
+
+    assert asyncio.run(store.clear("c1")) is True
+    assert asyncio.run(store.get_history("c1")) == []
+    assert asyncio.run(store.clear("c1")) is False
+
+
+def test_idle_conversation_expires_on_read(clock):
+    store = InMemoryConversationStore()
+    asyncio.run(store.append("c1", turn("hi")))
+
+    clock.now += 61
+
+    assert asyncio.run(store.get_history("c1")) == []
+    assert asyncio.run(store.get_recent("c1", 10)) == []
+    assert asyncio.run(store.clear("c1")) is False
+
+
+def test_idle_conversations_are_evicted_on_write(clock):
+    store = InMemoryConversationStore()
+    asyncio.run(store.append("old", turn("hi")))
+    clock.now += 61
+
+    asyncio.run(store.append("new", turn("hi")))
+
+    assert list(store.conversations) == ["new"]
+    assert "old" not in store.last_active
+
+
+def test_activity_refreshes_ttl(clock):
+    store = InMemoryConversationStore()
+    asyncio.run(store.append("c1", turn("a")))
+    clock.now += 50
+    asyncio.run(store.append("c1", turn("b")))
+    clock.now += 50
+
+    assert [t.content for t in asyncio.run(store.get_history("c1"))] == ["a", "b"]
+
+
+def test_least_recently_active_conversation_is_evicted_past_cap(monkeypatch):
+    monkeypatch.setattr(conversation_store, "MAX_CONVERSATIONS", 2)
+    store = InMemoryConversationStore()
+    for conversation_id in ("a", "b", "c"):
+        asyncio.run(store.append(conversation_id, turn("hi")))
+
+    assert list(store.conversations) == ["b", "c"]
@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from chatbot.services import groq_service
+from chatbot.services.conversation_store import InMemoryConversationStore
+from chatbot.services.groq_service import FALLBACK_MESSAGE, GroqChatService
+
+
+class FakeCompletions:
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        return self._stream()
+
+    async def _stream(self):
+        for i, content in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("Groq went away")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    svc = GroqChatService()
+    svc.conversations = InMemoryConversationStore()
+    return svc
+
+
+def use_completions(service, completions: FakeCompletions) -> None:
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def collect(stream) -> list:
+    async def run():
+        return [chunk async for chunk in stream]
+
+    return asyncio.run(run())
+
+
+def test_response_cache_evicts_least_recently_used(service, monkeypatch):
+    monkeypatch.setattr(groq_service, "RESPONSE_CACHE_SIZE", 2)
+    service._cache_response("a", "A")
+    service._cache_response("b", "B")
+    assert service._get_cached_response("a") == "A"
+
+    service._cache_response("c", "C")
+
+    assert list(service.response_cache) == ["a", "c"]
+    assert service._get_cached_response("b") is None
+
+
+def test_stream_saves_turn_and_releases_slot(service):
+    use_completions(service, FakeCompletions(["Hel", "lo"]))
+
+    async def run():
+        slot = await service.acquire_slot()
+        chunks = [chunk async for chunk in service.chat_stream("hi", "c1", slot)]
+        return chunks, await service.get_conversation_history("c1")
+
+    chunks, history = asyncio.run(run())
+
+    assert chunks == ["Hel", "lo"]
+    assert [m["content"] for m in history] == ["hi", "Hello"]
+    assert service.inflight._value == groq_service.GROQ_MAX_INFLIGHT
+
+
+def test_stream_replays_cached_reply_without_calling_groq(service):
+    completions = FakeCompletions(["Hello"])
+    use_completions(service, completions)
+    collect(service.chat_stream("hi", "c1"))
+
+    assert collect(service.chat_stream("hi", "c2")) == ["Hello"]
+    assert completions.calls == 1
+
+
+def test_stream_failure_before_first_chunk_yields_fallback(service):
+    use_completions(service, FakeCompletions(["Hello"], fail_after=0))
+
+    assert collect(service.chat_stream("hi", "c1")) == [FALLBACK_MESSAGE]
+    assert asyncio.run(service.get_conversation_history("c1")) == []
+
+
+def test_stream_failure_mid_reply_is_raised_and_not_saved(service):
+    use_completions(service, FakeCompletions(["Hel", "lo"], fail_after=1))
+
+    with pytest.raises(RuntimeError):
+        collect(service.chat_stream("hi", "c1"))
+
+    assert asyncio.run(service.get_conversation_history("c1")) == []
+    assert service.inflight._value == groq_service.GROQ_MAX_INFLIGHT
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from chatbot.services.rate_limiter import AsyncTokenBucket
+
+
+@pytest.mark.parametrize("rpm", [0, -5])
+def test_rejects_non_positive_rpm(rpm):
+    with pytest.raises(ValueError):
+        AsyncTokenBucket(rpm)
+
+
+def test_allows_initial_burst_up_to_capacity(clock):
+    bucket = AsyncTokenBucket(rpm=3)
+
+    async def acquire_all():
+        for _ in range(3):
+            await bucket.acquire()
+
+    asyncio.run(acquire_all())
+
+    assert clock.sleeps == []
+
+
+def test_paces_requests_once_bucket_is_empty(clock):
+    bucket = AsyncTokenBucket(rpm=60)
+
+    async def acquire_many():
+        for _ in range(62):
+            await bucket.acquire()
+
+    asyncio.run(acquire_many())
+
+    # 60 rpm refills one token per second after the burst is spent
+    assert clock.sleeps == pytest.approx([1.0, 1.0])
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_refills_over_time_without_exceeding_capacity(clock):
+    bucket = AsyncTokenBucket(rpm=60)
+
+    async def drain_then_wait():
+        for _ in range(60):
+            await bucket.acquire()
+        clock.now += 600
+        await bucket.acquire()
+
+    asyncio.run(drain_then_wait())
+
+    assert clock.sleeps == []
+    assert bucket.tokens == pytest.approx(59)
+
+
+def test_fractional_rpm_paces_below_one_request_per_minute(clock):
+    bucket = AsyncTokenBucket(rpm=0.5)
+
+    async def acquire_twice():
+        await bucket.acquire()
+        await bucket.acquire()
+
+    asyncio.run(acquire_twice())
+
+    assert clock.sleeps == pytest.approx([120.0])